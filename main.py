@@ -15,15 +15,35 @@ By default, the success-score-name is "did_item_pass".
 """
 
 import click
+from click.core import ParameterSource
 
 import dotenv
 
-from src.reporting import produce_junit_report, produce_text_report
+REPORT_TYPES = ("junit", "text")
+
+
+def _parse_reports(
+    ctx: click.Context, param: click.Parameter, values: tuple[str, ...]
+) -> dict[str, str | None]:
+    """Parses each TYPE[=FILE] value of --report into a report type -> file dict."""
+    outputs: dict[str, str | None] = {}
+    for value in values:
+        report_type, _, output_file = value.partition("=")
+        if report_type not in REPORT_TYPES:
+            raise click.BadParameter(
+                f"{report_type!r} is not one of {', '.join(REPORT_TYPES)}"
+            )
+        if report_type in outputs:
+            raise click.BadParameter(f"{report_type} report requested more than once")
+        if not output_file and None in outputs.values():
+            raise click.BadParameter("only one report can be printed to stdout")
+        outputs[report_type] = output_file or None
+    return outputs
 
 
 @click.group()
 def main():
-    dotenv.load_dotenv()
+    pass
 
 
 @main.command()
@@ -47,7 +67,7 @@ def main():
 )
 @click.option(
     "--report-type",
-    type=click.Choice(["junit", "text"]),
+    type=click.Choice(REPORT_TYPES),
     default="junit",
     help="Format of the generated report. 'junit' produces JUnit XML for CI/CD integration, 'text' produces human-readable summary with aggregated statistics."
 )
@@ -57,12 +77,36 @@ def main():
     default=None,
     help="File path to save the report. If not specified, the report is printed to stdout."
 )
+@click.option(
+    "--report",
+    "reports",
+    multiple=True,
+    callback=_parse_reports,
+    metavar="TYPE[=FILE]",
+    help="Report to generate, e.g. 'junit=report.xml', or 'text' to print it to stdout. Repeat it to write several formats from a single fetch of the run. Replaces --report-type and --output-file."
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Always fetch traces from Langfuse instead of reusing the ones cached in .langfuse_cache from previous runs."
+)
+@click.option(
+    "--async",
+    "use_async",
+    is_flag=True,
+    default=False,
+    help="Fetch traces with asyncio straight from the Langfuse REST API, allowing many more requests in flight than the default thread pool. Requires LANGFUSE_PUBLIC_KEY and LANGFUSE_SECRET_KEY in the environment."
+)
 def report(
     dataset_name: str,
     run_name: str,
     success_score_name: str,
     report_type: str,
     output_file: str | None,
+    reports: dict[str, str | None],
+    no_cache: bool,
+    use_async: bool,
 ):
     """
     Generate a report for a Langfuse dataset run in the specified format.
@@ -81,6 +125,10 @@ def report(
         - Text: Human-readable format with aggregated statistics. Shows item count,
           average scores, and detailed breakdown of all evaluation metrics.
 
+    Fetched traces are cached on disk in .langfuse_cache, so reporting on the
+    same run again doesn't hit Langfuse for traces it has already seen. The run
+    itself is always fetched. Use --no-cache to skip the cache.
+
     Examples:
         # Generate JUnit XML report to stdout
         python main.py report --dataset-name "my-dataset" --run-name "test-run"
@@ -89,16 +137,40 @@ def report(
         python main.py report --dataset-name "my-dataset" --run-name "test-run" \\
                               --report-type text --output-file "report.txt"
 
+        # Generate both reports to files, fetching the run once
+        python main.py report --dataset-name "my-dataset" --run-name "test-run" \\
+                              --report junit=report.xml --report text=summary.txt
+
         # Use custom success score name
         python main.py report --dataset-name "my-dataset" --run-name "test-run" \\
                               --success-score-name "accuracy"
     """
-    if report_type == "junit":
-        produce_junit_report(dataset_name, run_name, success_score_name, output_file)
-    elif report_type == "text":
-        produce_text_report(dataset_name, run_name, success_score_name, output_file)
+    if reports:
+        ctx = click.get_current_context()
+        for param_name in ("report_type", "output_file"):
+            if ctx.get_parameter_source(param_name) != ParameterSource.DEFAULT:
+                raise click.UsageError(
+                    "--report can't be combined with --report-type or --output-file"
+                )
     else:
-        raise ValueError(f"Invalid report type: {report_type}")
+        reports = {report_type: output_file}
+
+    # Loaded here rather than in the group callback, so help and other
+    # paths that never talk to Langfuse skip looking for a .env file.
+    dotenv.load_dotenv()
+
+    # Imported here since it pulls in the Langfuse SDK (pydantic, httpx, ...),
+    # which would otherwise slow down --help.
+    from src.reporting import produce_reports
+
+    produce_reports(
+        dataset_name,
+        run_name,
+        success_score_name,
+        reports,
+        use_cache=not no_cache,
+        use_async=use_async,
+    )
 
 
 if __name__ == "__main__":
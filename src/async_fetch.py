@@ -0,0 +1,85 @@
+"""
+Fetches traces concurrently from a single thread with asyncio and httpx.
+
+This talks to the Langfuse public REST API directly instead of going through
+the SDK, so hundreds of requests can be in flight without a thread for each.
+It needs the credentials in the environment, see has_credentials.
+"""
+
+import asyncio
+import os
+from urllib.parse import quote
+
+import httpx
+from tqdm import tqdm
+
+from src.cache import CachedTrace
+from src.config import langfuse_host, langfuse_timeout
+from src.models import Score
+
+DEFAULT_ASYNC_FETCH_CONCURRENCY = 64
+
+
+def has_credentials() -> bool:
+    return bool(
+        os.environ.get("LANGFUSE_PUBLIC_KEY") and os.environ.get("LANGFUSE_SECRET_KEY")
+    )
+
+
+def fetch_all(
+    trace_ids: list[str],
+    concurrency: int = DEFAULT_ASYNC_FETCH_CONCURRENCY,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> dict[str, CachedTrace]:
+    """Fetches the given traces, keyed by trace id.
+
+    Raises ValueError if a trace doesn't exist, and httpx.HTTPStatusError for
+    any other failed request.
+    """
+    return asyncio.run(_fetch_all(trace_ids, concurrency, transport))
+
+
+async def _fetch_all(
+    trace_ids: list[str],
+    concurrency: int,
+    transport: httpx.AsyncBaseTransport | None,
+) -> dict[str, CachedTrace]:
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(
+        base_url=langfuse_host(),
+        auth=(os.environ["LANGFUSE_PUBLIC_KEY"], os.environ["LANGFUSE_SECRET_KEY"]),
+        timeout=langfuse_timeout(),
+        limits=httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        ),
+        transport=transport,
+    ) as client:
+        with tqdm(total=len(trace_ids), desc="Fetching traces") as progress:
+
+            async def fetch(trace_id: str) -> tuple[str, CachedTrace]:
+                async with semaphore:
+                    trace = await _fetch_trace(client, trace_id)
+                progress.update()
+                return trace_id, trace
+
+            return dict(
+                await asyncio.gather(*(fetch(trace_id) for trace_id in trace_ids))
+            )
+
+
+async def _fetch_trace(client: httpx.AsyncClient, trace_id: str) -> CachedTrace:
+    response = await client.get(f"/api/public/traces/{quote(trace_id, safe='')}")
+    if response.status_code == 404:
+        raise ValueError(f"Trace {trace_id} not found")
+    response.raise_for_status()
+
+    data = response.json()
+    return {
+        "cost": data.get("totalCost"),
+        "duration": data.get("latency"),
+        "scores": [
+            Score(score["name"], value)
+            for score in data.get("scores", [])
+            if (value := score.get("value")) is not None
+        ],
+    }
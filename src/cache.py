@@ -0,0 +1,69 @@
+import os
+import shelve
+import time
+from pathlib import Path
+from typing import Self, TypedDict
+
+from src.config import langfuse_host
+from src.models import Score
+
+DEFAULT_CACHE_DIR = ".langfuse_cache"
+# Traces of a finished dataset run don't change, the TTL only bounds how long
+# stale entries (e.g. scores added after the fact) can linger on disk.
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+# Part of every key, bump it whenever the layout of CachedTrace changes so
+# entries written by older versions are ignored instead of misread.
+CACHE_FORMAT_VERSION = 2
+
+
+class CachedTrace(TypedDict):
+    cost: float | None
+    duration: float | None
+    scores: list[Score]
+
+
+class TraceCache:
+    """Persistent cache of the trace data needed to build a report.
+
+    Entries are keyed by Langfuse host, public key (i.e. project) and trace id,
+    so switching credentials never serves another project's traces.
+    Only use the cache from the thread that opened it: depending on the
+    Python version, the shelf is backed by sqlite3, which refuses other threads.
+    """
+
+    def __init__(
+        self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_CACHE_TTL
+    ):
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        # Kept open for the lifetime of the cache, see close and __exit__
+        self._shelf = shelve.open(os.path.join(cache_dir, "traces"))  # noqa: SIM115
+        self._ttl = ttl
+        self._namespace = "v{}:{}:{}".format(
+            CACHE_FORMAT_VERSION,
+            langfuse_host(),
+            os.environ.get("LANGFUSE_PUBLIC_KEY", ""),
+        )
+
+    def _key(self, trace_id: str) -> str:
+        return f"{self._namespace}:{trace_id}"
+
+    def get(self, trace_id: str) -> CachedTrace | None:
+        entry = self._shelf.get(self._key(trace_id))
+        if entry is None:
+            return None
+        cached_at, trace = entry
+        if time.time() - cached_at > self._ttl:
+            return None
+        return trace
+
+    def set(self, trace_id: str, trace: CachedTrace) -> None:
+        self._shelf[self._key(trace_id)] = (time.time(), trace)
+
+    def close(self) -> None:
+        self._shelf.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
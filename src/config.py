@@ -0,0 +1,16 @@
+"""
+Langfuse settings read from the environment, with the Langfuse SDK's defaults.
+"""
+
+import os
+
+DEFAULT_LANGFUSE_HOST = "https://cloud.langfuse.com"
+DEFAULT_LANGFUSE_TIMEOUT = 20  # seconds
+
+
+def langfuse_host() -> str:
+    return os.environ.get("LANGFUSE_HOST", DEFAULT_LANGFUSE_HOST)
+
+
+def langfuse_timeout() -> int:
+    return int(os.environ.get("LANGFUSE_TIMEOUT", str(DEFAULT_LANGFUSE_TIMEOUT)))
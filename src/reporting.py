@@ -1,76 +1,256 @@
-from functools import lru_cache
-from collections import defaultdict
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import replace
+from functools import lru_cache, partial, update_wrapper
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Generator
+from typing import BinaryIO
 
 import click
+import httpx
 
 from langfuse.client import Langfuse
 from langfuse.api.resources.commons.errors import NotFoundError, UnauthorizedError
+from langfuse.api.resources.commons.types.dataset_run_item import DatasetRunItem
 
-from tqdm.auto import tqdm
+from tqdm import tqdm
 
+from src.async_fetch import DEFAULT_ASYNC_FETCH_CONCURRENCY, fetch_all, has_credentials
+from src.cache import CachedTrace, TraceCache
+from src.config import langfuse_timeout
 from src.models import GenericItemInfo
 
+# Traces are fetched one request at a time, so this is the number of
+# requests kept in flight. The Langfuse client shares a single httpx.Client,
+# which is thread-safe, across all workers, see _get_client.
+DEFAULT_FETCH_CONCURRENCY = 16
+# Write buffer for report files, large enough that a report of a few thousand
+# test cases reaches the disk in a handful of writes.
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def _get_fetch_concurrency(default: int = DEFAULT_FETCH_CONCURRENCY) -> int:
+    return max(1, int(os.environ.get("LANGFUSE_FETCH_CONCURRENCY", default)))
+
 
 def produce_junit_report(
-    dataset_name: str, run_name: str, success_score_name: str, output_file: str | None
+    dataset_name: str,
+    run_name: str,
+    success_score_name: str,
+    output_file: str | None,
+    use_cache: bool = False,
+    use_async: bool = False,
 ) -> None:
-    output_fd = None if output_file is None else open(output_file, "w")
-    generic_items = _get_dataset_run_items(dataset_name, run_name)
-    if generic_items is None:
-        return
-
-    click.echo(
-        f"<?xml version='1.0' encoding='UTF-8'?>\n<testsuite name='langfuse-eval' tests='{len(generic_items)}'>",
-        file=output_fd,
+    produce_reports(
+        dataset_name,
+        run_name,
+        success_score_name,
+        {"junit": output_file},
+        use_cache,
+        use_async,
     )
-    for item in generic_items:
-        click.echo(item.to_junit(success_score_name), file=output_fd)
-    click.echo("</testsuite>", file=output_fd)
-    if output_fd is not None:
-        output_fd.close()
 
 
 def produce_text_report(
-    dataset_name: str, run_name: str, success_score_name: str, output_file: str | None
+    dataset_name: str,
+    run_name: str,
+    success_score_name: str,
+    output_file: str | None,
+    use_cache: bool = False,
+    use_async: bool = False,
 ) -> None:
-    output_fd = None if output_file is None else open(output_file, "w")
-    generic_items = _get_dataset_run_items(dataset_name, run_name)
+    produce_reports(
+        dataset_name,
+        run_name,
+        success_score_name,
+        {"text": output_file},
+        use_cache,
+        use_async,
+    )
+
+
+def produce_reports(
+    dataset_name: str,
+    run_name: str,
+    success_score_name: str,
+    outputs: dict[str, str | None],
+    use_cache: bool = False,
+    use_async: bool = False,
+) -> None:
+    """Writes several reports of one run, fetching the run only once.
+
+    `outputs` maps each report type ("junit" or "text") to the file it is
+    written to, or None for stdout.
+    """
+    invalid_report_types = outputs.keys() - _REPORT_WRITERS.keys()
+    if invalid_report_types:
+        raise ValueError(
+            f"Invalid report type: {', '.join(sorted(invalid_report_types))}"
+        )
+
+    generic_items = _get_dataset_run_items(dataset_name, run_name, use_cache, use_async)
     if generic_items is None:
         return
 
-    aggregate_scores = defaultdict(list)
-    for item in generic_items:
-        for score in item.scores:
-            aggregate_scores[score["name"]].append(score["value"])
+    for report_type, output_file in outputs.items():
+        with _open_output(output_file) as output_fd:
+            _REPORT_WRITERS[report_type](
+                output_fd, generic_items, run_name, success_score_name
+            )
 
-    output_fd = None if output_file is None else open(output_file, "w")
 
-    click.echo(f"# Eval {run_name}", file=output_fd)
-    click.echo(f"{len(generic_items)} items\n", file=output_fd)
+def _write_junit_report(
+    output_fd: BinaryIO,
+    generic_items: list[GenericItemInfo],
+    run_name: str,
+    success_score_name: str,
+) -> None:
+    output_fd.write(
+        f"<?xml version='1.0' encoding='UTF-8'?>\n<testsuite name='langfuse-eval' tests='{len(generic_items)}'>\n".encode()
+    )
+    # Test cases are rendered and encoded one at a time as the buffered
+    # handle consumes them, so only a single test case is held in memory,
+    # never the report. Writing bytes skips the text layer entirely.
+    output_fd.writelines(
+        f"{item.to_junit(success_score_name)}\n".encode() for item in generic_items
+    )
+    output_fd.write(b"</testsuite>\n")
 
-    click.echo("# All scores\n", file=output_fd)
-    for score_name, score_values in aggregate_scores.items():
-        score_avg = (
-            sum(score_values) / len(score_values) if len(score_values) > 0 else 0
-        )
-        click.echo(
+
+def _write_text_report(
+    output_fd: BinaryIO,
+    generic_items: list[GenericItemInfo],
+    run_name: str,
+    success_score_name: str,
+) -> None:
+    # Running [sum, count] per score name. The sum starts at int 0, like
+    # sum() does, so integer scores still print as integers.
+    aggregate_scores: defaultdict[str, list] = defaultdict(lambda: [0, 0])
+    for item in generic_items:
+        for name, value in item.scores:
+            aggregate = aggregate_scores[name]
+            aggregate[0] += value
+            aggregate[1] += 1
+
+    lines = [
+        f"# Eval {run_name}\n",
+        f"{len(generic_items)} items\n\n",
+        "# All scores\n\n",
+    ]
+    for score_name, (score_sum, score_count) in aggregate_scores.items():
+        score_avg = score_sum / score_count if score_count > 0 else 0
+        lines.append(
             f"- {score_name}\n"
             f"  avg: {score_avg}\n"
-            f"  count: {len(score_values)}\n"
-            f"  sum: {sum(score_values)}",
-            file=output_fd,
+            f"  count: {score_count}\n"
+            f"  sum: {score_sum}\n"
         )
 
-    if output_fd is not None:
-        output_fd.close()
+    # The report is small, so it is encoded and written in one go
+    output_fd.write("".join(lines).encode())
+
 
+_REPORT_WRITERS: dict[
+    str, Callable[[BinaryIO, list[GenericItemInfo], str, str], None]
+] = {
+    "junit": _write_junit_report,
+    "text": _write_text_report,
+}
 
-@lru_cache
+
+@contextmanager
+def _open_output(output_file: str | None) -> Generator[BinaryIO]:
+    if output_file is None:
+        # Text already written to stdout must come out before these bytes
+        sys.stdout.flush()
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+        return
+    with open(output_file, "wb", buffering=OUTPUT_BUFFER_SIZE) as output_fd:
+        yield output_fd
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> Langfuse:
+    # Building a client sets up its HTTP connection pool and background
+    # threads, so a single one is shared by every report in the process.
+    # The pool keeps a connection alive per fetching thread, so workers reuse
+    # warm connections instead of queueing for one or paying a new handshake.
+    concurrency = _get_fetch_concurrency()
+    return Langfuse(
+        httpx_client=httpx.Client(
+            timeout=langfuse_timeout(),
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+        )
+    )
+
+
+class _RunItemsMemo:
+    """Memoizes the items of successfully fetched dataset runs.
+
+    Unlike lru_cache, failed fetches (None) are not remembered, so retrying
+    after a transient error goes back to Langfuse. At most `maxsize` runs are
+    kept, least recently used first out, and each for at most `ttl` seconds so
+    long-lived processes pick up items added to a run later on.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str, bool, bool], list[GenericItemInfo] | None],
+        maxsize: int = 128,
+        ttl: float = 300,
+    ):
+        self._fetch = fetch
+        self._maxsize = maxsize
+        self._ttl = ttl
+        # Values are (fetched_at, items), ordered from least to most recently used
+        self._items: OrderedDict[
+            tuple[str, str, bool, bool], tuple[float, list[GenericItemInfo]]
+        ] = OrderedDict()
+        update_wrapper(self, fetch)
+
+    def __call__(
+        self,
+        dataset_name: str,
+        run_name: str,
+        use_cache: bool = False,
+        use_async: bool = False,
+    ) -> list[GenericItemInfo] | None:
+        key = (dataset_name, run_name, use_cache, use_async)
+        entry = self._items.get(key)
+        if entry is not None and time.monotonic() - entry[0] <= self._ttl:
+            self._items.move_to_end(key)
+            return entry[1]
+
+        items = self._fetch(dataset_name, run_name, use_cache, use_async)
+        if items is None:
+            self._items.pop(key, None)
+            return None
+
+        self._items[key] = (time.monotonic(), items)
+        self._items.move_to_end(key)
+        if len(self._items) > self._maxsize:
+            self._items.popitem(last=False)
+        return items
+
+    def cache_clear(self) -> None:
+        self._items.clear()
+
+
+@_RunItemsMemo
 def _get_dataset_run_items(
-    dataset_name: str, run_name: str
+    dataset_name: str, run_name: str, use_cache: bool = False, use_async: bool = False
 ) -> list[GenericItemInfo] | None:
     try:
-        langfuse = Langfuse()
+        langfuse = _get_client()
+        # This returns every item of the run in one response. The SDK has no
+        # paginated listing of run items (its dataset_run_items resource can
+        # only create), so there is nothing to page through here.
         run = langfuse.get_dataset_run(dataset_name, run_name)
     except NotFoundError:
         click.secho(f"Run {run_name} not found in dataset {dataset_name}", fg="red")
@@ -87,7 +267,107 @@ def _get_dataset_run_items(
         click.secho(f"Run {run_name} has no items", fg="red")
         return
 
+    if use_async and not has_credentials():
+        click.secho(
+            "Async fetching needs LANGFUSE_PUBLIC_KEY and LANGFUSE_SECRET_KEY, "
+            "falling back to the Langfuse SDK",
+            fg="yellow",
+            err=True,
+        )
+        use_async = False
+
+    with TraceCache() if use_cache else nullcontext() as cache:
+        if use_async:
+            return _fetch_items_async(dataset_run_items, cache)
+
+        return _fetch_items(dataset_run_items, langfuse, cache)
+
+
+def _fetch_items(
+    dataset_run_items: list[DatasetRunItem],
+    langfuse: Langfuse,
+    cache: TraceCache | None,
+) -> list[GenericItemInfo]:
+    cached = _get_cached_traces(dataset_run_items, cache)
+
+    # Several items of a run can point at the same trace (e.g. reruns), so
+    # each distinct trace is fetched once, through its first item.
+    first_items: dict[str, DatasetRunItem] = {}
+    for item in dataset_run_items:
+        if item.trace_id not in cached:
+            first_items.setdefault(item.trace_id, item)
+
+    # There is no bulk alternative to fetching each trace: `fetch_traces` can't
+    # filter by trace id and only returns score ids, not their values.
+    fetch_item = partial(GenericItemInfo.from_langfuse_item, langfuse=langfuse)
+    with ThreadPoolExecutor(max_workers=_get_fetch_concurrency()) as executor:
+        fetched = dict(
+            zip(
+                first_items,
+                tqdm(
+                    executor.map(fetch_item, first_items.values()),
+                    total=len(first_items),
+                    desc="Fetching traces",
+                ),
+            )
+        )
+
+    # The cache is only used from this thread, never from the workers: its
+    # shelf can be backed by sqlite3, which refuses use from other threads.
+    if cache is not None:
+        for trace_id, generic_item in fetched.items():
+            cache.set(
+                trace_id,
+                {
+                    "cost": generic_item.cost,
+                    "duration": generic_item.duration,
+                    "scores": generic_item.scores,
+                },
+            )
+
+    generic_items = []
+    for item in dataset_run_items:
+        trace = cached.get(item.trace_id)
+        if trace is not None:
+            generic_item = GenericItemInfo.from_trace_data(item, trace)
+        else:
+            generic_item = fetched[item.trace_id]
+            if item is not first_items[item.trace_id]:
+                generic_item = replace(generic_item, item_id=item.id)
+        generic_items.append(generic_item)
+    return generic_items
+
+
+def _fetch_items_async(
+    dataset_run_items: list[DatasetRunItem], cache: TraceCache | None
+) -> list[GenericItemInfo]:
+    traces = _get_cached_traces(dataset_run_items, cache)
+    missing_trace_ids = list(
+        dict.fromkeys(
+            item.trace_id for item in dataset_run_items if item.trace_id not in traces
+        )
+    )
+    fetched = fetch_all(
+        missing_trace_ids, _get_fetch_concurrency(DEFAULT_ASYNC_FETCH_CONCURRENCY)
+    )
+    if cache is not None:
+        for trace_id, trace in fetched.items():
+            cache.set(trace_id, trace)
+    traces.update(fetched)
+
     return [
-        GenericItemInfo.from_langfuse_item(item, langfuse)
-        for item in tqdm(dataset_run_items, desc="Fetching traces")
+        GenericItemInfo.from_trace_data(item, traces[item.trace_id])
+        for item in dataset_run_items
     ]
+
+
+def _get_cached_traces(
+    dataset_run_items: list[DatasetRunItem], cache: TraceCache | None
+) -> dict[str, CachedTrace]:
+    traces: dict[str, CachedTrace] = {}
+    if cache is not None:
+        for item in dataset_run_items:
+            cached = cache.get(item.trace_id)
+            if cached is not None:
+                traces[item.trace_id] = cached
+    return traces
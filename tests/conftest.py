@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def make_run_item():
+    """Factory for lightweight dataset run items."""
+
+    def make(item_id, trace_id):
+        return SimpleNamespace(id=item_id, trace_id=trace_id)
+
+    return make
+
+
+@pytest.fixture
+def make_run():
+    """Factory for lightweight dataset runs."""
+
+    def make(items):
+        return SimpleNamespace(dataset_run_items=items)
+
+    return make
+
+
+@pytest.fixture
+def make_trace():
+    """Factory for lightweight traces, as returned by Langfuse.fetch_trace.
+
+    Scores are given as (name, value) pairs.
+    """
+
+    def make(total_cost, latency, scores):
+        return SimpleNamespace(
+            data=SimpleNamespace(
+                total_cost=total_cost,
+                latency=latency,
+                scores=[
+                    SimpleNamespace(name=name, value=value) for name, value in scores
+                ],
+            )
+        )
+
+    return make
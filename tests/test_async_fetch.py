@@ -0,0 +1,99 @@
+import httpx
+import pytest
+
+from src.async_fetch import fetch_all, has_credentials
+from src.models import Score
+
+
+class TestFetchAll:
+    """Test cases for fetch_all function."""
+
+    @pytest.fixture(autouse=True)
+    def credentials(self, monkeypatch):
+        """Langfuse credentials in the environment."""
+        monkeypatch.setenv("LANGFUSE_PUBLIC_KEY", "pk-test")
+        monkeypatch.setenv("LANGFUSE_SECRET_KEY", "sk-test")
+        monkeypatch.setenv("LANGFUSE_HOST", "https://langfuse.example.com")
+
+    @staticmethod
+    def trace_handler(request: httpx.Request) -> httpx.Response:
+        """Serves traces the way the Langfuse public API does."""
+        trace_id = request.url.path.rsplit("/", 1)[-1]
+        if trace_id == "missing-trace":
+            return httpx.Response(404, json={"message": "Trace not found"})
+        return httpx.Response(
+            200,
+            json={
+                "id": trace_id,
+                "totalCost": 0.25,
+                "latency": 2.5,
+                "scores": [
+                    {"name": "accuracy", "value": 0.95},
+                    {"name": "success", "value": 1.0},
+                    {"name": "comment", "value": None},
+                ],
+            },
+        )
+
+    def test_fetch_all_success(self):
+        """Test fetch_all returns the trace data for every trace id."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return self.trace_handler(request)
+
+        result = fetch_all(
+            ["trace-1", "trace-2"],
+            concurrency=2,
+            transport=httpx.MockTransport(handler),
+        )
+
+        assert result == {
+            trace_id: {
+                "cost": 0.25,
+                "duration": 2.5,
+                "scores": [Score("accuracy", 0.95), Score("success", 1.0)],
+            }
+            for trace_id in ("trace-1", "trace-2")
+        }
+        assert sorted(str(request.url) for request in requests) == [
+            "https://langfuse.example.com/api/public/traces/trace-1",
+            "https://langfuse.example.com/api/public/traces/trace-2",
+        ]
+        assert requests[0].headers["authorization"].startswith("Basic ")
+
+    def test_fetch_all_trace_not_found(self):
+        """Test fetch_all raises ValueError for missing traces."""
+        with pytest.raises(ValueError, match="Trace missing-trace not found"):
+            fetch_all(
+                ["trace-1", "missing-trace"],
+                transport=httpx.MockTransport(self.trace_handler),
+            )
+
+    def test_fetch_all_http_error(self):
+        """Test fetch_all raises for failed requests."""
+        transport = httpx.MockTransport(lambda request: httpx.Response(500))
+        with pytest.raises(httpx.HTTPStatusError):
+            fetch_all(["trace-1"], transport=transport)
+
+
+@pytest.mark.parametrize(
+    "public_key,secret_key,expected",
+    [
+        ("pk-test", "sk-test", True),
+        ("pk-test", None, False),
+        (None, "sk-test", False),
+    ],
+)
+def test_has_credentials(monkeypatch, public_key, secret_key, expected):
+    """Test has_credentials requires both Langfuse keys."""
+    for name, value in (
+        ("LANGFUSE_PUBLIC_KEY", public_key),
+        ("LANGFUSE_SECRET_KEY", secret_key),
+    ):
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, value)
+    assert has_credentials() is expected
@@ -0,0 +1,48 @@
+import pytest
+
+from src.cache import TraceCache
+from src.models import Score
+
+
+class TestTraceCache:
+    """Test cases for TraceCache class."""
+
+    @pytest.fixture
+    def cached_trace(self):
+        """Sample cached trace data."""
+        return {
+            "cost": 0.25,
+            "duration": 2.5,
+            "scores": [Score(name="success", value=1.0)],
+        }
+
+    def test_get_missing_trace(self, tmp_path):
+        """Test get returns None for traces that were never cached."""
+        with TraceCache(str(tmp_path)) as cache:
+            assert cache.get("unknown-trace") is None
+
+    def test_set_and_get_persists_across_instances(self, tmp_path, cached_trace):
+        """Test cached traces survive closing and reopening the cache."""
+        with TraceCache(str(tmp_path)) as cache:
+            cache.set("trace-1", cached_trace)
+
+        with TraceCache(str(tmp_path)) as cache:
+            assert cache.get("trace-1") == cached_trace
+
+    def test_expired_entries_are_ignored(self, tmp_path, cached_trace):
+        """Test entries older than the TTL are treated as missing."""
+        with TraceCache(str(tmp_path)) as cache:
+            cache.set("trace-1", cached_trace)
+
+        with TraceCache(str(tmp_path), ttl=-1) as cache:
+            assert cache.get("trace-1") is None
+
+    def test_entries_are_scoped_to_project(self, tmp_path, cached_trace, monkeypatch):
+        """Test traces cached for one public key are not served for another."""
+        monkeypatch.setenv("LANGFUSE_PUBLIC_KEY", "pk-project-a")
+        with TraceCache(str(tmp_path)) as cache:
+            cache.set("trace-1", cached_trace)
+
+        monkeypatch.setenv("LANGFUSE_PUBLIC_KEY", "pk-project-b")
+        with TraceCache(str(tmp_path)) as cache:
+            assert cache.get("trace-1") is None
@@ -0,0 +1,24 @@
+from src.config import (
+    DEFAULT_LANGFUSE_HOST,
+    DEFAULT_LANGFUSE_TIMEOUT,
+    langfuse_host,
+    langfuse_timeout,
+)
+
+
+def test_langfuse_host(monkeypatch):
+    """Test LANGFUSE_HOST overrides the Langfuse Cloud default."""
+    monkeypatch.delenv("LANGFUSE_HOST", raising=False)
+    assert langfuse_host() == DEFAULT_LANGFUSE_HOST
+
+    monkeypatch.setenv("LANGFUSE_HOST", "https://langfuse.example.com")
+    assert langfuse_host() == "https://langfuse.example.com"
+
+
+def test_langfuse_timeout(monkeypatch):
+    """Test LANGFUSE_TIMEOUT is read as whole seconds."""
+    monkeypatch.delenv("LANGFUSE_TIMEOUT", raising=False)
+    assert langfuse_timeout() == DEFAULT_LANGFUSE_TIMEOUT
+
+    monkeypatch.setenv("LANGFUSE_TIMEOUT", "5")
+    assert langfuse_timeout() == 5
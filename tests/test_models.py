@@ -148,6 +148,46 @@ class TestGenericItemInfo:
         )
         assert result == expected_junit
 
+    def test_to_junit_with_whitespace_in_score_name(self):
+        """Test to_junit replaces whitespace in score names like dots."""
+        item = GenericItemInfo(
+            item_id="test",
+            trace_id="trace",
+            cost=None,
+            duration=1.0,
+            scores=[Score(name="answer relevancy.v2", value=0.5)],
+        )
+        result = item.to_junit("success")
+
+        assert (
+            "<property name='evals.scores.answer_relevancy_v2.value' value='0.5' />"
+            in result
+        )
+
+    def test_to_junit_escapes_special_characters(self):
+        """Test to_junit escapes XML special characters in attribute values."""
+        item = GenericItemInfo(
+            item_id="item<1>",
+            trace_id="trace&'2'",
+            cost=1.0,
+            duration=1.0,
+            scores=[Score(name='judge\'s "pick"', value=1)],
+        )
+        result = item.to_junit("a&b")
+
+        expected_junit = textwrap.dedent(
+            """\
+            <testcase classname='langfuse' name='item&lt;1&gt;' time='1.0'>
+                <properties>
+                    <property name='evals.trace_id' value='trace&amp;&apos;2&apos;' />
+                    <property name='evals.cost' value='1.0' />
+                    <property name='evals.scores.judge&apos;s_&quot;pick&quot;.value' value='1' />
+                </properties>
+                <failure message='Test case failed. a&amp;b is either missing or its value is not 1.0' />
+            </testcase>"""
+        )
+        assert result == expected_junit
+
     def test_to_junit_with_no_scores(self):
         """Test to_junit method with no scores."""
         item = GenericItemInfo(
@@ -218,8 +258,8 @@ class TestGenericItemInfoFromLangfuseItem:
         assert len(result.scores) == 2  # Should exclude None value score
 
         # Check scores
-        score_names = [score["name"] for score in result.scores]
-        score_values = [score["value"] for score in result.scores]
+        score_names = [score.name for score in result.scores]
+        score_values = [score.value for score in result.scores]
         assert "accuracy" in score_names
         assert "success" in score_names
         assert "null_score" not in score_names
@@ -1,9 +1,23 @@
+import httpx
 import pytest
-from unittest.mock import Mock, patch, mock_open
+from unittest.mock import Mock, call, patch, mock_open
 import tempfile
 import os
-
-from src.reporting import produce_junit_report, produce_text_report, _get_dataset_run_items
+import time
+
+from src.reporting import (
+    produce_junit_report,
+    produce_text_report,
+    produce_reports,
+    _get_client,
+    _get_dataset_run_items,
+    _RunItemsMemo,
+    _get_fetch_concurrency,
+    DEFAULT_FETCH_CONCURRENCY,
+    OUTPUT_BUFFER_SIZE,
+)
+from src.async_fetch import DEFAULT_ASYNC_FETCH_CONCURRENCY
+from src.models import Score
 from langfuse.api.resources.commons.errors import NotFoundError, UnauthorizedError
 from langfuse.api.resources.commons.types.dataset_run_item import DatasetRunItem
 
@@ -12,8 +26,9 @@ class TestProduceJunitReport:
     """Test cases for produce_junit_report function."""
 
     def setup_method(self):
-        """Clear the cache before each test."""
+        """Clear the caches before each test."""
         _get_dataset_run_items.cache_clear()
+        _get_client.cache_clear()
 
     @pytest.fixture
     def mock_langfuse(self):
@@ -148,6 +163,26 @@ class TestProduceJunitReport:
             in captured.out
         )
 
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_retries_after_error(
+        self, mock_langfuse_class, mock_langfuse, mock_run, mock_trace, capsys
+    ):
+        """Test a failed run fetch is not cached and is retried on the next call."""
+        # Setup mocks
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.side_effect = [
+            Exception("Network timeout"),
+            mock_run,
+        ]
+        mock_langfuse.fetch_trace.return_value = mock_trace
+
+        produce_junit_report("test-dataset", "test-run", "success", None)
+        produce_junit_report("test-dataset", "test-run", "success", None)
+
+        assert mock_langfuse.get_dataset_run.call_count == 2
+        captured = capsys.readouterr()
+        assert "<testsuite name='langfuse-eval' tests='1'>" in captured.out
+
     @patch("src.reporting.Langfuse")
     def test_produce_junit_report_no_dataset_items(
         self, mock_langfuse_class, mock_langfuse, capsys
@@ -235,6 +270,248 @@ class TestProduceJunitReport:
         # Check XML header has correct test count
         assert "<testsuite name='langfuse-eval' tests='2'>" in output
 
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_preserves_item_order(
+        self, mock_langfuse_class, mock_langfuse, mock_trace, capsys, monkeypatch
+    ):
+        """Test produce_junit_report keeps run order when fetching concurrently."""
+        monkeypatch.setenv("LANGFUSE_FETCH_CONCURRENCY", "4")
+        items = []
+        for i in range(10):
+            item = Mock(spec=DatasetRunItem)
+            item.id = f"item-{i}"
+            item.trace_id = f"trace-{i}"
+            items.append(item)
+
+        mock_run = Mock()
+        mock_run.dataset_run_items = items
+
+        # Setup mocks
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.return_value = mock_run
+        mock_langfuse.fetch_trace.return_value = mock_trace
+
+        # Call function
+        produce_junit_report("test-dataset", "test-run", "success", None)
+
+        # Capture stdout output
+        captured = capsys.readouterr()
+        output = captured.out
+
+        positions = [output.index(f"name='item-{i}'") for i in range(10)]
+        assert positions == sorted(positions)
+
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_fetches_traces_concurrently(
+        self, mock_langfuse_class, mock_langfuse, mock_trace, capsys, monkeypatch
+    ):
+        """Test slow trace fetches overlap instead of running back to back."""
+        monkeypatch.setenv("LANGFUSE_FETCH_CONCURRENCY", "4")
+        items = []
+        for i in range(4):
+            item = Mock(spec=DatasetRunItem)
+            item.id = f"item-{i}"
+            item.trace_id = f"trace-{i}"
+            items.append(item)
+
+        mock_run = Mock()
+        mock_run.dataset_run_items = items
+
+        def slow_fetch_trace(trace_id):
+            time.sleep(0.2)
+            return mock_trace
+
+        # Setup mocks
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.return_value = mock_run
+        mock_langfuse.fetch_trace.side_effect = slow_fetch_trace
+
+        start = time.monotonic()
+        produce_junit_report("test-dataset", "test-run", "success", None)
+        elapsed = time.monotonic() - start
+
+        # Sequential fetching would take 0.8s
+        assert elapsed < 0.6
+        assert mock_langfuse.fetch_trace.call_count == 4
+        captured = capsys.readouterr()
+        assert "<testsuite name='langfuse-eval' tests='4'>" in captured.out
+
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_fetches_shared_trace_once(
+        self, mock_langfuse_class, mock_langfuse, mock_trace, capsys
+    ):
+        """Test items sharing a trace only fetch it once."""
+        item1 = Mock(spec=DatasetRunItem)
+        item1.id = "item-1"
+        item1.trace_id = "shared"
+
+        item2 = Mock(spec=DatasetRunItem)
+        item2.id = "item-2"
+        item2.trace_id = "shared"
+
+        mock_run = Mock()
+        mock_run.dataset_run_items = [item1, item2]
+
+        # Setup mocks
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.return_value = mock_run
+        mock_langfuse.fetch_trace.return_value = mock_trace
+
+        produce_junit_report("test-dataset", "test-run", "success", None)
+
+        assert mock_langfuse.fetch_trace.call_count == 1
+        captured = capsys.readouterr()
+        output = captured.out
+        assert "<testsuite name='langfuse-eval' tests='2'>" in output
+        assert "<testcase classname='langfuse' name='item-1'" in output
+        assert "<testcase classname='langfuse' name='item-2'" in output
+
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_refetches_cached_run(
+        self,
+        mock_langfuse_class,
+        mock_langfuse,
+        mock_run,
+        mock_dataset_run_item,
+        mock_trace,
+        capsys,
+        monkeypatch,
+        tmp_path,
+    ):
+        """Test a run reported again is fetched again, reusing only cached traces."""
+        monkeypatch.chdir(tmp_path)
+        # Setup mocks
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.return_value = mock_run
+        mock_langfuse.fetch_trace.return_value = mock_trace
+
+        produce_junit_report("test-dataset", "test-run", "success", None, True)
+        capsys.readouterr()
+
+        # The run gained an item, e.g. from a CI retry under the same run name
+        new_item = Mock(spec=DatasetRunItem)
+        new_item.id = "new-item"
+        new_item.trace_id = "new-trace"
+        mock_run.dataset_run_items = [mock_dataset_run_item, new_item]
+        # Drop the in-process memo, as a new CLI process would
+        _get_dataset_run_items.cache_clear()
+        produce_junit_report("test-dataset", "test-run", "success", None, True)
+
+        assert mock_langfuse.get_dataset_run.call_count == 2
+        assert mock_langfuse.fetch_trace.call_args_list == [
+            call("test-trace-456"),
+            call("new-trace"),
+        ]
+        output = capsys.readouterr().out
+        assert "tests='2'" in output
+        assert "name='new-item'" in output
+
+    @patch("src.reporting.fetch_all")
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_async(
+        self,
+        mock_langfuse_class,
+        mock_fetch_all,
+        mock_langfuse,
+        mock_run,
+        capsys,
+        monkeypatch,
+    ):
+        """Test produce_junit_report fetches traces through fetch_all with use_async."""
+        monkeypatch.setenv("LANGFUSE_PUBLIC_KEY", "pk-test")
+        monkeypatch.setenv("LANGFUSE_SECRET_KEY", "sk-test")
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.return_value = mock_run
+        mock_fetch_all.return_value = {
+            "test-trace-456": {
+                "cost": 0.25,
+                "duration": 2.5,
+                "scores": [Score("success", 1.0)],
+            }
+        }
+
+        produce_junit_report(
+            "test-dataset", "test-run", "success", None, use_async=True
+        )
+
+        mock_fetch_all.assert_called_once_with(
+            ["test-trace-456"], DEFAULT_ASYNC_FETCH_CONCURRENCY
+        )
+        mock_langfuse.fetch_trace.assert_not_called()
+        captured = capsys.readouterr()
+        assert "<property name='evals.scores.success.value' value='1.0' />" in captured.out
+
+    @patch("src.reporting.fetch_all")
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_async_without_credentials(
+        self,
+        mock_langfuse_class,
+        mock_fetch_all,
+        mock_langfuse,
+        mock_run,
+        mock_trace,
+        capsys,
+        monkeypatch,
+    ):
+        """Test use_async falls back to the SDK when credentials are missing."""
+        monkeypatch.delenv("LANGFUSE_PUBLIC_KEY", raising=False)
+        monkeypatch.delenv("LANGFUSE_SECRET_KEY", raising=False)
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.return_value = mock_run
+        mock_langfuse.fetch_trace.return_value = mock_trace
+
+        produce_junit_report(
+            "test-dataset", "test-run", "success", None, use_async=True
+        )
+
+        mock_fetch_all.assert_not_called()
+        mock_langfuse.fetch_trace.assert_called_once_with("test-trace-456")
+        captured = capsys.readouterr()
+        assert "falling back to the Langfuse SDK" in captured.err
+        assert "<testsuite name='langfuse-eval' tests='1'>" in captured.out
+
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_with_trace_cache(
+        self,
+        mock_langfuse_class,
+        mock_langfuse,
+        mock_trace,
+        capsys,
+        monkeypatch,
+        tmp_path,
+    ):
+        """Test the trace cache works with traces fetched from several threads."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("LANGFUSE_FETCH_CONCURRENCY", "4")
+        items = []
+        for i in range(3):
+            item = Mock(spec=DatasetRunItem)
+            item.id = f"item-{i}"
+            item.trace_id = f"trace-{i}"
+            items.append(item)
+
+        # Setup mocks
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.fetch_trace.return_value = mock_trace
+
+        # A first run caches the traces of its two items
+        mock_langfuse.get_dataset_run.return_value = Mock(dataset_run_items=items[:2])
+        produce_junit_report("test-dataset", "run-a", "success", None, True)
+        capsys.readouterr()
+        assert mock_langfuse.fetch_trace.call_count == 2
+
+        # A second run only fetches the trace that isn't cached yet
+        mock_langfuse.fetch_trace.reset_mock()
+        mock_langfuse.get_dataset_run.return_value = Mock(dataset_run_items=items)
+        produce_junit_report("test-dataset", "run-b", "success", None, True)
+
+        mock_langfuse.fetch_trace.assert_called_once_with("trace-2")
+        output = capsys.readouterr().out
+        assert "<testsuite name='langfuse-eval' tests='3'>" in output
+        positions = [output.index(f"name='item-{i}'") for i in range(3)]
+        assert positions == sorted(positions)
+        assert output.count("<property name='evals.cost' value='0.25' />") == 3
+
     @patch("src.reporting.Langfuse")
     def test_produce_junit_report_with_failure_case(
         self, mock_langfuse_class, mock_langfuse, capsys
@@ -318,9 +595,28 @@ class TestProduceJunitReport:
         with patch("builtins.open", mock_file):
             produce_junit_report("test-dataset", "test-run", "success", "test.xml")
 
-            # Verify file was opened and closed
-            mock_file.assert_called_once_with("test.xml", "w")
-            mock_file().close.assert_called_once()
+            # Verify file was opened and closed by its context manager
+            mock_file.assert_called_once_with(
+                "test.xml", "wb", buffering=OUTPUT_BUFFER_SIZE
+            )
+            mock_file().__exit__.assert_called_once()
+
+    @patch("src.reporting.Langfuse")
+    def test_produce_junit_report_does_not_open_file_on_error(
+        self, mock_langfuse_class, mock_langfuse
+    ):
+        """Test produce_junit_report leaves the output file untouched on errors."""
+        # Setup mocks
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.side_effect = NotFoundError("Not found")
+
+        # Mock file operations
+        mock_file = mock_open()
+
+        with patch("builtins.open", mock_file):
+            produce_junit_report("test-dataset", "test-run", "success", "test.xml")
+
+            mock_file.assert_not_called()
 
     @patch("src.reporting.Langfuse")
     def test_produce_junit_report_with_dots_in_score_names(
@@ -402,12 +698,156 @@ class TestProduceJunitReport:
         assert "<property name='evals.trace_id' value='test-trace' />" in output
 
 
+class TestProduceReports:
+    """Test cases for produce_reports function."""
+
+    def setup_method(self):
+        """Clear the caches before each test."""
+        _get_dataset_run_items.cache_clear()
+        _get_client.cache_clear()
+
+    @patch("src.reporting.Langfuse")
+    def test_produce_reports_fetches_run_once(
+        self,
+        mock_langfuse_class,
+        tmp_path,
+        make_run_item,
+        make_run,
+        make_trace,
+    ):
+        """Test both report types are written from a single fetch of the run."""
+        mock_langfuse = Mock()
+        mock_langfuse_class.return_value = mock_langfuse
+        mock_langfuse.get_dataset_run.return_value = make_run(
+            [make_run_item("item-1", "trace-1")]
+        )
+        mock_langfuse.fetch_trace.return_value = make_trace(
+            0.25, 2.5, [("success", 1.0)]
+        )
+        junit_file = tmp_path / "report.xml"
+        text_file = tmp_path / "report.txt"
+
+        produce_reports(
+            "test-dataset",
+            "test-run",
+            "success",
+            {"junit": str(junit_file), "text": str(text_file)},
+        )
+
+        mock_langfuse.get_dataset_run.assert_called_once()
+        mock_langfuse.fetch_trace.assert_called_once()
+        assert "<testcase classname='langfuse' name='item-1'" in junit_file.read_text()
+        assert "# Eval test-run" in text_file.read_text()
+
+    @patch("src.reporting.Langfuse")
+    def test_produce_reports_invalid_report_type(self, mock_langfuse_class):
+        """Test unknown report types are rejected before fetching anything."""
+        with pytest.raises(ValueError, match="Invalid report type: html"):
+            produce_reports("test-dataset", "test-run", "success", {"html": None})
+
+        mock_langfuse_class.assert_not_called()
+
+
+class TestGetClient:
+    """Test cases for _get_client function."""
+
+    def setup_method(self):
+        """Clear the cache before each test."""
+        _get_client.cache_clear()
+
+    @patch("src.reporting.Langfuse")
+    def test_get_client_reuses_client(self, mock_langfuse_class):
+        """Test the Langfuse client is only built once."""
+        assert _get_client() is _get_client()
+        mock_langfuse_class.assert_called_once()
+
+    @patch("src.reporting.httpx.Client")
+    @patch("src.reporting.Langfuse")
+    def test_get_client_sizes_pool_to_concurrency(
+        self, mock_langfuse_class, mock_httpx_client, monkeypatch
+    ):
+        """Test the HTTP pool keeps a connection per fetching thread."""
+        monkeypatch.setenv("LANGFUSE_FETCH_CONCURRENCY", "32")
+        _get_client()
+
+        mock_langfuse_class.assert_called_once_with(
+            httpx_client=mock_httpx_client.return_value
+        )
+        limits = mock_httpx_client.call_args.kwargs["limits"]
+        assert limits == httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+
+class TestRunItemsMemo:
+    """Test cases for _RunItemsMemo class."""
+
+    @pytest.fixture
+    def fetch(self):
+        """Mock run fetch returning a fresh list per call."""
+        return Mock(side_effect=lambda *args: [Mock()])
+
+    def test_caches_successful_fetches(self, fetch):
+        """Test repeated calls for the same run are served from the memo."""
+        memo = _RunItemsMemo(fetch)
+        assert memo("dataset", "run") is memo("dataset", "run")
+        fetch.assert_called_once_with("dataset", "run", False, False)
+
+    def test_keeps_names_exact(self, fetch):
+        """Test names are passed through as given, whitespace included."""
+        memo = _RunItemsMemo(fetch)
+        assert memo("dataset", " run ") is not memo("dataset", "run")
+        assert fetch.call_args_list == [
+            call("dataset", " run ", False, False),
+            call("dataset", "run", False, False),
+        ]
+
+    def test_evicts_least_recently_used(self, fetch):
+        """Test the memo keeps at most maxsize runs."""
+        memo = _RunItemsMemo(fetch, maxsize=2)
+        memo("dataset", "run-1")
+        memo("dataset", "run-2")
+        memo("dataset", "run-1")
+        memo("dataset", "run-3")
+
+        memo("dataset", "run-1")
+        assert fetch.call_count == 3
+        memo("dataset", "run-2")
+        assert fetch.call_count == 4
+
+    def test_expires_entries(self, fetch):
+        """Test entries older than the TTL are fetched again."""
+        memo = _RunItemsMemo(fetch, ttl=-1)
+        memo("dataset", "run")
+        memo("dataset", "run")
+        assert fetch.call_count == 2
+
+
+class TestGetFetchConcurrency:
+    """Test cases for _get_fetch_concurrency function."""
+
+    @pytest.mark.parametrize(
+        "env_value,expected",
+        [
+            (None, DEFAULT_FETCH_CONCURRENCY),
+            ("4", 4),
+            ("0", 1),
+        ],
+    )
+    def test_get_fetch_concurrency(self, monkeypatch, env_value, expected):
+        """Test the fetch concurrency is read from LANGFUSE_FETCH_CONCURRENCY."""
+        if env_value is None:
+            monkeypatch.delenv("LANGFUSE_FETCH_CONCURRENCY", raising=False)
+        else:
+            monkeypatch.setenv("LANGFUSE_FETCH_CONCURRENCY", env_value)
+        assert _get_fetch_concurrency() == expected
+
+
 class TestProduceJunitReportSnapshots:
     """Snapshot tests for produce_junit_report function."""
 
     def setup_method(self):
-        """Clear the cache before each test."""
+        """Clear the caches before each test."""
         _get_dataset_run_items.cache_clear()
+        _get_client.cache_clear()
 
     @pytest.fixture
     def snapshot_configured(self, snapshot):
@@ -417,40 +857,24 @@ class TestProduceJunitReportSnapshots:
 
     @patch("src.reporting.Langfuse")
     def test_produce_junit_report_success_snapshot(
-        self, mock_langfuse_class, snapshot_configured, capsys
+        self,
+        mock_langfuse_class,
+        snapshot_configured,
+        capsys,
+        make_run_item,
+        make_run,
+        make_trace,
     ):
         """Snapshot test for successful JUnit report generation."""
         # Setup mocks
         mock_langfuse = Mock()
         mock_langfuse_class.return_value = mock_langfuse
-
-        # Setup item
-        item = Mock(spec=DatasetRunItem)
-        item.id = "snapshot-test-item"
-        item.trace_id = "snapshot-test-trace"
-
-        # Setup trace
-        mock_score1 = Mock()
-        mock_score1.name = "accuracy"
-        mock_score1.value = 0.95
-
-        mock_score2 = Mock()
-        mock_score2.name = "success"
-        mock_score2.value = 1.0
-
-        mock_trace_data = Mock()
-        mock_trace_data.total_cost = 0.25
-        mock_trace_data.latency = 2.5
-        mock_trace_data.scores = [mock_score1, mock_score2]
-
-        mock_trace = Mock()
-        mock_trace.data = mock_trace_data
-
-        mock_run = Mock()
-        mock_run.dataset_run_items = [item]
-
-        mock_langfuse.get_dataset_run.return_value = mock_run
-        mock_langfuse.fetch_trace.return_value = mock_trace
+        mock_langfuse.get_dataset_run.return_value = make_run(
+            [make_run_item("snapshot-test-item", "snapshot-test-trace")]
+        )
+        mock_langfuse.fetch_trace.return_value = make_trace(
+            0.25, 2.5, [("accuracy", 0.95), ("success", 1.0)]
+        )
 
         # Call function
         produce_junit_report("test-dataset", "test-run", "success", None)
@@ -464,36 +888,25 @@ class TestProduceJunitReportSnapshots:
 
     @patch("src.reporting.Langfuse")
     def test_produce_junit_report_failure_snapshot(
-        self, mock_langfuse_class, snapshot_configured, capsys
+        self,
+        mock_langfuse_class,
+        snapshot_configured,
+        capsys,
+        make_run_item,
+        make_run,
+        make_trace,
     ):
         """Snapshot test for failed JUnit report generation."""
         # Setup mocks
         mock_langfuse = Mock()
         mock_langfuse_class.return_value = mock_langfuse
-
-        # Setup item
-        item = Mock(spec=DatasetRunItem)
-        item.id = "failing-snapshot-item"
-        item.trace_id = "failing-snapshot-trace"
-
-        # Setup trace with no success score
-        mock_score = Mock()
-        mock_score.name = "accuracy"
-        mock_score.value = 0.5
-
-        mock_trace_data = Mock()
-        mock_trace_data.total_cost = 0.1
-        mock_trace_data.latency = 1.0
-        mock_trace_data.scores = [mock_score]
-
-        mock_trace = Mock()
-        mock_trace.data = mock_trace_data
-
-        mock_run = Mock()
-        mock_run.dataset_run_items = [item]
-
-        mock_langfuse.get_dataset_run.return_value = mock_run
-        mock_langfuse.fetch_trace.return_value = mock_trace
+        mock_langfuse.get_dataset_run.return_value = make_run(
+            [make_run_item("failing-snapshot-item", "failing-snapshot-trace")]
+        )
+        # Trace with no success score
+        mock_langfuse.fetch_trace.return_value = make_trace(
+            0.1, 1.0, [("accuracy", 0.5)]
+        )
 
         # Call function
         produce_junit_report("test-dataset", "test-run", "success", None)
@@ -507,44 +920,27 @@ class TestProduceJunitReportSnapshots:
 
     @patch("src.reporting.Langfuse")
     def test_produce_junit_report_multiple_items_snapshot(
-        self, mock_langfuse_class, snapshot_configured, capsys
+        self,
+        mock_langfuse_class,
+        snapshot_configured,
+        capsys,
+        make_run_item,
+        make_run,
+        make_trace,
     ):
         """Snapshot test for JUnit report with multiple items."""
         # Setup mocks
         mock_langfuse = Mock()
         mock_langfuse_class.return_value = mock_langfuse
-
-        # Setup multiple items
-        item1 = Mock(spec=DatasetRunItem)
-        item1.id = "multi-item-1"
-        item1.trace_id = "multi-trace-1"
-
-        item2 = Mock(spec=DatasetRunItem)
-        item2.id = "multi-item-2"
-        item2.trace_id = "multi-trace-2"
-
-        # Setup trace data
-        mock_score1 = Mock()
-        mock_score1.name = "success"
-        mock_score1.value = 1.0
-
-        mock_score2 = Mock()
-        mock_score2.name = "accuracy"
-        mock_score2.value = 0.8
-
-        mock_trace_data = Mock()
-        mock_trace_data.total_cost = 0.15
-        mock_trace_data.latency = 1.5
-        mock_trace_data.scores = [mock_score1, mock_score2]
-
-        mock_trace = Mock()
-        mock_trace.data = mock_trace_data
-
-        mock_run = Mock()
-        mock_run.dataset_run_items = [item1, item2]
-
-        mock_langfuse.get_dataset_run.return_value = mock_run
-        mock_langfuse.fetch_trace.return_value = mock_trace
+        mock_langfuse.get_dataset_run.return_value = make_run(
+            [
+                make_run_item("multi-item-1", "multi-trace-1"),
+                make_run_item("multi-item-2", "multi-trace-2"),
+            ]
+        )
+        mock_langfuse.fetch_trace.return_value = make_trace(
+            0.15, 1.5, [("success", 1.0), ("accuracy", 0.8)]
+        )
 
         # Call function
         produce_junit_report("test-dataset", "test-run", "success", None)
@@ -558,17 +954,13 @@ class TestProduceJunitReportSnapshots:
 
     @patch("src.reporting.Langfuse")
     def test_produce_junit_report_empty_snapshot(
-        self, mock_langfuse_class, snapshot_configured, capsys
+        self, mock_langfuse_class, snapshot_configured, capsys, make_run
     ):
         """Snapshot test for empty JUnit report."""
         # Setup mocks
         mock_langfuse = Mock()
         mock_langfuse_class.return_value = mock_langfuse
-
-        mock_run = Mock()
-        mock_run.dataset_run_items = []
-
-        mock_langfuse.get_dataset_run.return_value = mock_run
+        mock_langfuse.get_dataset_run.return_value = make_run([])
 
         # Call function
         produce_junit_report("test-dataset", "test-run", "success", None)
@@ -580,6 +972,7 @@ class TestProduceJunitReportSnapshots:
         # Compare with snapshot
         snapshot_configured.assert_match(full_output, "junit_report_empty.xml")
 
+
 class TestProduceTextReportSnapshots:
     """Snapshot tests for produce_text_report function."""
 
@@ -590,50 +983,31 @@ class TestProduceTextReportSnapshots:
         return snapshot
 
     def setup_method(self):
-        """Clear the cache before each test."""
+        """Clear the caches before each test."""
         _get_dataset_run_items.cache_clear()
+        _get_client.cache_clear()
 
     @patch("src.reporting.Langfuse")
     def test_produce_text_report_success_snapshot(
-        self, mock_langfuse_class, snapshot_configured, capsys
+        self,
+        mock_langfuse_class,
+        snapshot_configured,
+        capsys,
+        make_run_item,
+        make_run,
+        make_trace,
     ):
         """Snapshot test for successful text report generation."""
         # Setup mocks
         mock_langfuse = Mock()
         mock_langfuse_class.return_value = mock_langfuse
-
-        # Setup item
-        item = Mock(spec=DatasetRunItem)
-        item.id = "text-test-item"
-        item.trace_id = "text-test-trace"
-
-        # Setup trace with multiple scores
-        mock_score1 = Mock()
-        mock_score1.name = "accuracy"
-        mock_score1.value = 0.95
-
-        mock_score2 = Mock()
-        mock_score2.name = "precision"
-        mock_score2.value = 0.88
-
-        mock_score3 = Mock()
-        mock_score3.name = "recall"
-        mock_score3.value = 0.92
-
-        mock_trace_data = Mock()
-        mock_trace_data.total_cost = 0.25
-        mock_trace_data.latency = 2.5
-        mock_trace_data.scores = [mock_score1, mock_score2, mock_score3]
-
-        mock_trace = Mock()
-        mock_trace.data = mock_trace_data
-
-        # Create mock run with specific item
-        mock_run = Mock()
-        mock_run.dataset_run_items = [item]
-
-        mock_langfuse.get_dataset_run.return_value = mock_run
-        mock_langfuse.fetch_trace.return_value = mock_trace
+        mock_langfuse.get_dataset_run.return_value = make_run(
+            [make_run_item("text-test-item", "text-test-trace")]
+        )
+        # Trace with multiple scores
+        mock_langfuse.fetch_trace.return_value = make_trace(
+            0.25, 2.5, [("accuracy", 0.95), ("precision", 0.88), ("recall", 0.92)]
+        )
 
         # Call function
         produce_text_report("test-dataset", "test-run", "success", None)
@@ -647,45 +1021,27 @@ class TestProduceTextReportSnapshots:
 
     @patch("src.reporting.Langfuse")
     def test_produce_text_report_multiple_items_snapshot(
-        self, mock_langfuse_class, snapshot_configured, capsys
+        self,
+        mock_langfuse_class,
+        snapshot_configured,
+        capsys,
+        make_run_item,
+        make_run,
+        make_trace,
     ):
         """Snapshot test for text report with multiple items."""
         # Setup mocks
         mock_langfuse = Mock()
         mock_langfuse_class.return_value = mock_langfuse
-
-        # Setup multiple items
-        item1 = Mock(spec=DatasetRunItem)
-        item1.id = "text-item-1"
-        item1.trace_id = "text-trace-1"
-
-        item2 = Mock(spec=DatasetRunItem)
-        item2.id = "text-item-2"
-        item2.trace_id = "text-trace-2"
-
-        # Setup trace data with different scores for each item
-        mock_score1 = Mock()
-        mock_score1.name = "accuracy"
-        mock_score1.value = 0.8
-
-        mock_score2 = Mock()
-        mock_score2.name = "precision"
-        mock_score2.value = 0.75
-
-        mock_trace_data = Mock()
-        mock_trace_data.total_cost = 0.15
-        mock_trace_data.latency = 1.5
-        mock_trace_data.scores = [mock_score1, mock_score2]
-
-        mock_trace = Mock()
-        mock_trace.data = mock_trace_data
-
-        # Create mock run with specific items
-        mock_run = Mock()
-        mock_run.dataset_run_items = [item1, item2]
-
-        mock_langfuse.get_dataset_run.return_value = mock_run
-        mock_langfuse.fetch_trace.return_value = mock_trace
+        mock_langfuse.get_dataset_run.return_value = make_run(
+            [
+                make_run_item("text-item-1", "text-trace-1"),
+                make_run_item("text-item-2", "text-trace-2"),
+            ]
+        )
+        mock_langfuse.fetch_trace.return_value = make_trace(
+            0.15, 1.5, [("accuracy", 0.8), ("precision", 0.75)]
+        )
 
         # Call function
         produce_text_report("test-dataset", "test-run", "success", None)
@@ -699,18 +1055,13 @@ class TestProduceTextReportSnapshots:
 
     @patch("src.reporting.Langfuse")
     def test_produce_text_report_empty_snapshot(
-        self, mock_langfuse_class, snapshot_configured, capsys
+        self, mock_langfuse_class, snapshot_configured, capsys, make_run
     ):
         """Snapshot test for empty text report."""
         # Setup mocks
         mock_langfuse = Mock()
         mock_langfuse_class.return_value = mock_langfuse
-
-        # Create mock run with empty items
-        mock_run = Mock()
-        mock_run.dataset_run_items = []
-
-        mock_langfuse.get_dataset_run.return_value = mock_run
+        mock_langfuse.get_dataset_run.return_value = make_run([])
 
         # Call function
         produce_text_report("test-dataset", "test-run", "success", None)
@@ -724,33 +1075,23 @@ class TestProduceTextReportSnapshots:
 
     @patch("src.reporting.Langfuse")
     def test_produce_text_report_no_scores_snapshot(
-        self, mock_langfuse_class, snapshot_configured, capsys
+        self,
+        mock_langfuse_class,
+        snapshot_configured,
+        capsys,
+        make_run_item,
+        make_run,
+        make_trace,
     ):
         """Snapshot test for text report with items but no scores."""
         # Setup mocks
         mock_langfuse = Mock()
         mock_langfuse_class.return_value = mock_langfuse
-
-        # Setup item
-        item = Mock(spec=DatasetRunItem)
-        item.id = "no-scores-item"
-        item.trace_id = "no-scores-trace"
-
-        # Setup trace with no scores
-        mock_trace_data = Mock()
-        mock_trace_data.total_cost = 0.1
-        mock_trace_data.latency = 1.0
-        mock_trace_data.scores = []
-
-        mock_trace = Mock()
-        mock_trace.data = mock_trace_data
-
-        # Create mock run with specific item
-        mock_run = Mock()
-        mock_run.dataset_run_items = [item]
-
-        mock_langfuse.get_dataset_run.return_value = mock_run
-        mock_langfuse.fetch_trace.return_value = mock_trace
+        mock_langfuse.get_dataset_run.return_value = make_run(
+            [make_run_item("no-scores-item", "no-scores-trace")]
+        )
+        # Trace with no scores
+        mock_langfuse.fetch_trace.return_value = make_trace(0.1, 1.0, [])
 
         # Call function
         produce_text_report("test-dataset", "test-run", "success", None)